@@ -5,12 +5,25 @@ Zero phone battery usage - runs entirely in cloud
 """
 
 import requests
-import pandas as pd
-import numpy as np
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone
 import json
 import os
 import sys # Added for clean exit on error
+import math
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json works the same here
+    from json import loads as json_loads
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # ============================================================================
 # CONFIGURATION (Set in GitHub Actions Secrets)
@@ -27,6 +40,10 @@ BOLLINGER_STD = 2.0
 SQUEEZE_THRESHOLD = 0.00035
 # Example: Exclude hours 7 AM to 10 AM, and 12 PM to 3 PM UTC
 EXCLUDED_HOURS = [] #[7, 8, 9, 12, 13, 14] 
+# Bit h is set when hour h is excluded (single shift/and test per check)
+_EXCLUDED_MASK = 0
+for _h in EXCLUDED_HOURS:
+    _EXCLUDED_MASK |= 1 << _h
 
 # State management (using Vercel KV or simple file)
 # NOTE: Cooldown logic requires persistent storage (like a database or Vercel KV).
@@ -35,6 +52,16 @@ EXCLUDED_HOURS = [] #[7, 8, 9, 12, 13, 14]
 LAST_ALERT_KEY = 'last_alert_time'
 ALERT_COOLDOWN = 3600  # 1 hour
 
+# Shared HTTP session so repeated calls reuse pooled (keep-alive) connections.
+# requests already sends "Connection: keep-alive" and "Accept-Encoding: gzip".
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Last Yahoo response validators and closes, reused on HTTP 304.
+# NOTE: Only lives as long as the process (see STATE MANAGEMENT below),
+# so it helps warm/long-running workers, not isolated GitHub Actions runs.
+_YAHOO_CACHE = {'etag': None, 'last_modified': None, 'closes': None}
+
 # ============================================================================
 # STATE MANAGEMENT (Simplified for GHA)
 # ============================================================================
@@ -56,6 +83,8 @@ def set_last_alert_time(timestamp):
 
 def fetch_twelve_data():
     """Fetch real-time forex data from Twelve Data"""
+    import numpy as np  # Imported lazily to keep startup fast on early exits
+    
     url = "https://api.twelvedata.com/time_series"
     params = {
         "symbol": "EUR/USD",
@@ -65,26 +94,18 @@ def fetch_twelve_data():
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-        data = response.json()
+        data = json_loads(response.content)
         
         if "values" not in data:
             return None, f"API Error: {data.get('message', 'Unknown')}"
         
-        df = pd.DataFrame(data["values"])
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime')
-        df = df.sort_index()
-        df = df.rename(columns={
-            'open': 'Open', 
-            'high': 'High', 
-            'low': 'Low', 
-            'close': 'Close'
-        })
-        df = df[['Open', 'High', 'Low', 'Close']].astype(float)
+        # Twelve Data returns newest bar first; sort oldest -> newest
+        values = sorted(data["values"], key=itemgetter('datetime'))
+        closes = np.fromiter((float(v['close']) for v in values), dtype=np.float64, count=len(values))
         
-        return df, None
+        return closes, None
         
     except requests.RequestException as e:
         return None, f"Request failed: {e}"
@@ -93,80 +114,119 @@ def fetch_twelve_data():
 
 def fetch_yahoo_fallback():
     """Fallback to Yahoo Finance"""
+    import numpy as np
+    
     try:
         url = "https://query1.finance.yahoo.com/v8/finance/chart/EURUSD=X"
         params = {"interval": "1m", "range": "1d"}
         
-        response = requests.get(url, params=params, timeout=10)
+        headers = {}
+        if _YAHOO_CACHE['closes'] is not None:
+            if _YAHOO_CACHE['etag']:
+                headers['If-None-Match'] = _YAHOO_CACHE['etag']
+            if _YAHOO_CACHE['last_modified']:
+                headers['If-Modified-Since'] = _YAHOO_CACHE['last_modified']
+        
+        response = _SESSION.get(url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        if response.status_code == 304:  # Bars unchanged since the last poll
+            return _YAHOO_CACHE['closes'], None
+        data = json_loads(response.content)
         
         result = data["chart"]["result"][0]
-        timestamps = result["timestamp"]
-        quotes = result["indicators"]["quote"][0]
+        raw_closes = result["indicators"]["quote"][0]["close"]  # Only Close is used
+        
+        # Bars are already in timestamp order; skip minutes with no close
+        closes = np.asarray([c for c in raw_closes if c is not None], dtype=np.float64)
         
-        df = pd.DataFrame({
-            'Open': quotes['open'],
-            'High': quotes['high'],
-            'Low': quotes['low'],
-            'Close': quotes['close']
-        })
-        df.index = pd.to_datetime(timestamps, unit='s')
-        df = df.dropna().sort_index()
+        _YAHOO_CACHE['etag'] = response.headers.get('ETag')
+        _YAHOO_CACHE['last_modified'] = response.headers.get('Last-Modified')
+        _YAHOO_CACHE['closes'] = closes
         
-        return df, None
+        return closes, None
         
     except Exception as e:
         return None, f"Yahoo fetch failed: {str(e)}"
 
+def fetch_market_data():
+    """Query Twelve Data and Yahoo concurrently, return the first usable result"""
+    sources = {fetch_twelve_data: 'Twelve Data', fetch_yahoo_fallback: 'Yahoo'}
+    errors = []
+    executor = ThreadPoolExecutor(max_workers=len(sources))
+    try:
+        pending = {executor.submit(fetch): name for fetch, name in sources.items()}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                closes, error = future.result()
+                if closes is not None:
+                    return closes, None
+                print(f"{name} failed. Error: {error}")
+                errors.append(f"{name}: {error}")
+    finally:
+        # Don't wait on the slower source once we have data
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return None, "; ".join(errors)
+
 # ============================================================================
 # TECHNICAL ANALYSIS
 # ============================================================================
 
-def calculate_bollinger_bands(df, period=20, std=2.0):
-    """Calculate Bollinger Bands"""
-    df['SMA'] = df['Close'].rolling(window=period).mean()
-    df['STD'] = df['Close'].rolling(window=period).std()
-    df['Upper_Band'] = df['SMA'] + (std * df['STD'])
-    df['Lower_Band'] = df['SMA'] - (std * df['STD'])
-    df['Band_Width'] = (df['Upper_Band'] - df['Lower_Band']) / df['SMA']
-    return df
+@njit(cache=True)
+def _bb_last(closes, period, std_mult):
+    """Return (latest close, band width) for the last `period` closes"""
+    # Welford's online mean/variance: avoids the cancellation of
+    # sum-of-squares when prices are tightly clustered around ~1.08
+    n = len(closes)
+    mean = 0.0
+    m2 = 0.0
+    for k in range(period):
+        x = closes[n - period + k]
+        delta = x - mean
+        mean += delta / (k + 1)
+        m2 += delta * (x - mean)
+    var = m2 / (period - 1)  # Sample variance (ddof=1)
+    return closes[n - 1], 2.0 * std_mult * math.sqrt(var) / mean  # (Upper - Lower) / SMA
+
+def calculate_bollinger_bands(closes, period=20, std=2.0):
+    """Calculate Bollinger Band width for the latest bar only"""
+    price, band_width = _bb_last(closes, period, std)
+    return {'price': price, 'band_width': band_width}
 
-def analyze_market():
+def analyze_market(now=None):
     """Main analysis function"""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    
     result = {
-        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'timestamp': now.isoformat(),
         'status': 'error',
         'message': '',
         'data': {}
     }
     
     # Fetch data
-    df, error = fetch_twelve_data()
-    if df is None:
-        print(f"Twelve Data failed. Trying Yahoo Fallback. Error: {error}")
-        df, error = fetch_yahoo_fallback()
+    closes, error = fetch_market_data()
     
-    if df is None:
+    if closes is None:
         result['message'] = f"Data fetch failed: {error}"
         return result
     
-    if len(df) < BOLLINGER_PERIOD:
-        result['message'] = f"Insufficient data: {len(df)} bars"
+    if len(closes) < BOLLINGER_PERIOD:
+        result['message'] = f"Insufficient data: {len(closes)} bars"
         return result
     
     # Calculate Bollinger Bands
-    df = calculate_bollinger_bands(df, BOLLINGER_PERIOD, BOLLINGER_STD)
-    
-    # Get latest values
-    latest = df.iloc[-1]
-    current_price = latest['Close']
-    band_width = latest['Band_Width']
+    bands = calculate_bollinger_bands(closes, BOLLINGER_PERIOD, BOLLINGER_STD)
+    current_price = bands['price']
+    band_width = bands['band_width']
     
     # Check conditions
     is_squeeze = band_width < SQUEEZE_THRESHOLD
-    current_hour = datetime.now(timezone.utc).hour
-    is_valid_hour = current_hour not in EXCLUDED_HOURS
+    current_hour = now.hour
+    is_valid_hour = not (_EXCLUDED_MASK >> current_hour) & 1
     
     # Populate result
     result['status'] = 'success'
@@ -178,7 +238,7 @@ def analyze_market():
         'current_hour': current_hour,
         'is_valid_hour': is_valid_hour,
         'signal': is_squeeze and is_valid_hour,
-        'bars_analyzed': len(df)
+        'bars_analyzed': len(closes)
     }
     
     return result
@@ -187,6 +247,25 @@ def analyze_market():
 # TELEGRAM NOTIFICATIONS
 # ============================================================================
 
+_TRADE_TEMPLATE = """
+🎯 <b>EURUSD TRADE SIGNAL!</b>
+
+⏰ <b>Time:</b> {time}
+💰 <b>Price:</b> {price:.5f}
+📊 <b>Band Width:</b> {band_width:.6f}
+
+📉 <b>TRADE SETUP:</b>
+▫️ Direction: SELL
+▫️ Size: 0.01 lots
+▫️ Stop Loss: {stop_loss:.5f} (+4 pips)
+▫️ Take Profit: {take_profit:.5f} (-20 pips)
+
+🚀 <b>Open Exness NOW and execute!</b>
+
+Strategy: Bollinger Squeeze
+Risk/Reward: 1:5
+"""
+
 def send_telegram_message(message, parse_mode='HTML'):
     """Send message via Telegram bot"""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
@@ -201,7 +280,7 @@ def send_telegram_message(message, parse_mode='HTML'):
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _SESSION.post(url, json=payload, timeout=10)
         response.raise_for_status()
         return True, "Sent"
     except requests.RequestException as e:
@@ -209,7 +288,7 @@ def send_telegram_message(message, parse_mode='HTML'):
     except Exception as e:
         return False, str(e)
 
-def send_trade_alert(data):
+def send_trade_alert(data, now=None):
     """Send formatted trade alert via Telegram"""
     price = data['price']
     band_width = data['band_width']
@@ -219,28 +298,17 @@ def send_trade_alert(data):
     stop_loss = price + 0.0004
     take_profit = price - 0.0020
     
-    current_time = datetime.now(timezone.utc).strftime('%H:%M GMT')
-    
-    message = f"""
-🎯 <b>EURUSD TRADE SIGNAL!</b>
-
-⏰ <b>Time:</b> {current_time}
-💰 <b>Price:</b> {price:.5f}
-📊 <b>Band Width:</b> {band_width:.6f}
-
-📉 <b>TRADE SETUP:</b>
-▫️ Direction: SELL
-▫️ Size: 0.01 lots
-▫️ Stop Loss: {stop_loss:.5f} (+4 pips)
-▫️ Take Profit: {take_profit:.5f} (-20 pips)
-
-🚀 <b>Open Exness NOW and execute!</b>
-
-Strategy: Bollinger Squeeze
-Risk/Reward: 1:5
-"""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    current_time = now.strftime('%H:%M GMT')
     
-    return send_telegram_message(message)
+    return send_telegram_message(_TRADE_TEMPLATE.format(
+        time=current_time,
+        price=price,
+        band_width=band_width,
+        stop_loss=stop_loss,
+        take_profit=take_profit
+    ))
 
 # ============================================================================
 # MAIN EXECUTION FUNCTION (Standalone Entry Point)
@@ -254,10 +322,13 @@ def main_execution():
         print("CRITICAL ERROR: TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID is missing. Check GitHub Secrets setup.")
         sys.exit(1) # Exit with an error code
         
-    print(f"[{datetime.now(timezone.utc).isoformat()}] Cron job triggered")
+    # One clock read per run, shared by the analysis, alert and cooldown
+    now = datetime.now(timezone.utc)
+    now_ts = now.timestamp()
+    print(f"[{now.isoformat()}] Cron job triggered")
     
     # --- ANALYZE MARKET ---
-    result = analyze_market()
+    result = analyze_market(now)
     
     if result['status'] == 'error':
         print(f"❌ Execution failed: {result['message']}")
@@ -272,14 +343,14 @@ def main_execution():
         
         # Cooldown check logic (will not work without a database!)
         last_alert = get_last_alert_time() 
-        time_since = datetime.now(timezone.utc).timestamp() - last_alert
+        time_since = now_ts - last_alert
         
         if time_since >= ALERT_COOLDOWN:
             # Send alert
-            success, msg = send_trade_alert(data)
+            success, msg = send_trade_alert(data, now)
             
             if success:
-                set_last_alert_time(datetime.now(timezone.utc).timestamp())
+                set_last_alert_time(now_ts)
                 print("✅ Alert sent successfully")
             else:
                 print(f"❌ Alert failed: {msg}")